@@ -0,0 +1,216 @@
+"""Game tree analysis of a game state."""
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from .board_state import Position
+from .checkerserror import CheckersError
+from .evaluation import EvaluationWeights, LinearEvaluator
+from .game_state import GameState, try_make_moves
+from .movement import Move
+from .packed_board import pack_boards
+from .pieces import PieceColor
+
+WIN_SCORE = 1_000_000.0
+"""Score of a position in which the opponent cannot move."""
+
+_CAPTURE_DISTANCE = 2
+
+
+@dataclass
+class MoveAnalysis:
+    """Statistics of the game tree below one move sequence of the current player.
+
+    Params:
+    move_path: the positions the piece moves through
+    nodes: number of game states explored below the move, including the state after the move
+    score: minimax score of the move, from the perspective of the player making it
+    best_line: move paths of the best play for both players, starting with this move
+    forced_win: whether the player making the move wins against any defense within the depth
+    capture_sequences: number of capture sequences available in the explored states
+    """
+
+    move_path: list[Position]
+    nodes: int
+    score: float
+    best_line: list[list[Position]]
+    forced_win: bool
+    capture_sequences: int
+
+    def to_json_dict(self) -> dict[str, object]:
+        """Convert to a dict of json compatible types."""
+        return {
+            "move_path": [str(position) for position in self.move_path],
+            "nodes": self.nodes,
+            "score": self.score,
+            "best_line": [
+                [str(position) for position in move_path]
+                for move_path in self.best_line
+            ],
+            "forced_win": self.forced_win,
+            "capture_sequences": self.capture_sequences,
+        }
+
+
+@dataclass
+class _SearchResult:
+    score: float
+    best_line: list[list[Position]]
+    nodes: int
+    capture_sequences: int
+
+
+def analyze_game_state(
+    game_state: GameState,
+    depth: int,
+    weights: EvaluationWeights | None = None,
+    max_workers: int | None = None,
+) -> Iterator[MoveAnalysis | CheckersError]:
+    """Explore the game tree of every move sequence of the current player in worker processes.
+
+    Args:
+        game_state: the state to analyze
+        depth: number of plies to explore, including the analyzed move
+        weights: evaluation weights used to score positions at the end of the explored lines
+        max_workers: number of worker processes, defaults to the number of processors
+
+    Yields:
+        the analysis of every move sequence as soon as its subtree is explored, or an Error
+    """
+    if depth < 1:
+        yield CheckersError("Analysis depth must be at least 1")
+        return
+    move_sequences = game_state.rule_set.legal_move_sequences(
+        game_state.board_state,
+        game_state.whose_turn,
+    )
+    if not move_sequences:
+        yield CheckersError(f"{game_state.whose_turn} has no moves left")
+        return
+    weights = EvaluationWeights() if weights is None else weights
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(analyze_move_sequence, game_state, moves, depth, weights)
+            for moves in move_sequences
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def analyze_move_sequence(
+    game_state: GameState,
+    moves: list[Move],
+    depth: int,
+    weights: EvaluationWeights,
+) -> MoveAnalysis | CheckersError:
+    """Explore the game tree below one move sequence.
+
+    Args:
+        game_state: the state the moves are made from
+        moves: the move sequence to analyze
+        depth: number of plies to explore, including the analyzed move
+        weights: evaluation weights used to score positions at the end of the explored lines
+
+    Returns:
+        statistics of the explored subtree, or an Error if the moves are illegal
+    """
+    next_game_state = try_make_moves(moves, game_state, cache=None)
+    if isinstance(next_game_state, CheckersError):
+        return next_game_state
+    evaluator = LinearEvaluator(weights)
+    # the search result is scored from the perspective of the opponent, who moves next
+    if depth == 1:
+        result = _evaluate_leaf(next_game_state, evaluator)
+    else:
+        result = _negamax(next_game_state, depth - 1, evaluator)
+    return MoveAnalysis(
+        move_path=_move_path(moves),
+        nodes=result.nodes,
+        score=-result.score,
+        best_line=[_move_path(moves), *result.best_line],
+        forced_win=-result.score >= WIN_SCORE,
+        capture_sequences=result.capture_sequences,
+    )
+
+
+def _negamax(
+    game_state: GameState,
+    depth: int,
+    evaluator: LinearEvaluator,
+) -> _SearchResult:
+    """Minimax search with scores from the perspective of the player to move."""
+    move_sequences = game_state.rule_set.legal_move_sequences(
+        game_state.board_state,
+        game_state.whose_turn,
+    )
+    capture_sequences = sum(_is_capture_sequence(moves) for moves in move_sequences)
+    children = []
+    for moves in move_sequences:
+        child = try_make_moves(moves, game_state, cache=None)
+        if not isinstance(child, CheckersError):
+            children.append((moves, child))
+    if not children:
+        return _SearchResult(
+            score=-WIN_SCORE,
+            best_line=[],
+            nodes=1,
+            capture_sequences=0,
+        )
+
+    if depth == 1:
+        # score all leaves of this node with one batched evaluation
+        scores = _player_sign(game_state.whose_turn) * evaluator.evaluate_batch(
+            pack_boards([child.board_state for _, child in children]),
+        )
+        best_index = int(scores.argmax())
+        return _SearchResult(
+            score=float(scores[best_index]),
+            best_line=[_move_path(children[best_index][0])],
+            nodes=1 + len(children),
+            capture_sequences=capture_sequences,
+        )
+
+    result = _SearchResult(
+        score=-float("inf"),
+        best_line=[],
+        nodes=1,
+        capture_sequences=capture_sequences,
+    )
+    for moves, child in children:
+        child_result = _negamax(child, depth - 1, evaluator)
+        result.nodes += child_result.nodes
+        result.capture_sequences += child_result.capture_sequences
+        if -child_result.score > result.score:
+            result.score = -child_result.score
+            result.best_line = [_move_path(moves), *child_result.best_line]
+    return result
+
+
+def _evaluate_leaf(game_state: GameState, evaluator: LinearEvaluator) -> _SearchResult:
+    """Score a game state without searching, from the perspective of the player to move."""
+    if game_state.rule_set.legal_move_sequences(
+        game_state.board_state,
+        game_state.whose_turn,
+    ):
+        score = _player_sign(game_state.whose_turn) * evaluator.evaluate(
+            game_state.board_state,
+        )
+    else:
+        score = -WIN_SCORE
+    return _SearchResult(score=score, best_line=[], nodes=1, capture_sequences=0)
+
+
+def _player_sign(player: PieceColor) -> int:
+    """Evaluation scores favor white when positive."""
+    return 1 if player == PieceColor.WHITE else -1
+
+
+def _is_capture_sequence(moves: list[Move]) -> bool:
+    return any(
+        abs(move.target_position.row - move.starting_position.row) == _CAPTURE_DISTANCE
+        for move in moves
+    )
+
+
+def _move_path(moves: list[Move]) -> list[Position]:
+    return [moves[0].starting_position, *(move.target_position for move in moves)]
@@ -1,26 +1,42 @@
 """Cli for checkers game."""
 import itertools
+import json
+import pathlib
 import uuid
+from datetime import timedelta
 
 import click
 
 from . import __version__
+from .analysis import analyze_game_state
 from .board_state import Position, position_from_position_str
 from .checkerserror import CheckersError
 from .game_state import try_make_moves
 from .game_state_persistence import (
+    CACHE_DIR_ENV_VAR,
     Game,
     GameStateManager,
     GlobalSettings,
 )
+from .move_validation_cache import MoveValidationCache
 from .movement import Move
+from .opening_book import book_entries_from_game, record_played_moves
+from .rule_set_interface import RuleSet
 from .rule_set_map import get_rule_set
 
 
 @click.group()
 @click.version_option(version=__version__)
-def main() -> None:
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    envvar=CACHE_DIR_ENV_VAR,
+    help=f"Directory where games and settings are stored. Can also be set with {CACHE_DIR_ENV_VAR}.",
+)
+def main(cache_dir: pathlib.Path | None) -> None:
     """This a checkers game with a command line interface."""
+    if cache_dir is not None:
+        GameStateManager.set_cache_dir(cache_dir)
 
 
 @click.command(name="new-game")
@@ -50,8 +66,17 @@ def new(rule_set_str: str) -> None:
 
 
 @click.command(name="list")
-def list_games() -> None:
+@click.option(
+    "-d",
+    "--details",
+    is_flag=True,
+    help="Load every game and show whose turn it is and piece counts.",
+)
+def list_games(*, details: bool) -> None:
     """List all saved games."""
+    if details:
+        _list_game_details()
+        return
     games = GameStateManager.get_saved_game_list()
     if not games:
         print("Currently no saved games")
@@ -65,6 +90,93 @@ def clear() -> None:
     GameStateManager.clear_saved_games()
 
 
+@click.command()
+@click.option(
+    "--older-than",
+    "older_than_days",
+    type=click.FloatRange(min=0),
+    required=True,
+    help="Age in days.",
+)
+def prune(older_than_days: float) -> None:
+    """Delete saved games not modified for longer than the given number of days.
+
+    The game saved as current is kept.
+    """
+    if not click.confirm(
+        f"Confirm deletion of saved games older than {older_than_days} days",
+    ):
+        return
+    deleted_count = 0
+    for result in GameStateManager.prune_saved_games(timedelta(days=older_than_days)):
+        if isinstance(result, CheckersError):
+            print(result.error_message)
+            continue
+        deleted_count += 1
+        print(f"Deleted {result}")
+    print(f"Deleted {deleted_count} games")
+
+
+@click.command()
+@click.argument("destination", type=click.Path(dir_okay=False, path_type=pathlib.Path))
+def export(destination: pathlib.Path) -> None:
+    """Export all saved games to DESTINATION, as one JSON object per line."""
+    exported_count = 0
+    for result in GameStateManager.export_saved_games(destination):
+        if isinstance(result, CheckersError):
+            print(result.error_message)
+            continue
+        exported_count += 1
+    print(f"Exported {exported_count} games to {destination}")
+
+
+@click.command()
+@click.option("-g", "--game-id", type=uuid.UUID)
+@click.option(
+    "-d",
+    "--depth",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Number of plies to explore.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes. Defaults to the number of processors.",
+)
+def analyze(game_id: uuid.UUID | None, depth: int, jobs: int | None) -> None:
+    """Explore the game tree of every possible move of the player to move.
+
+    Moves are analyzed in parallel worker processes. The statistics of every move are printed as a JSON
+    object on its own line as soon as its analysis is finished. If no game id is provided, analyze game
+    saved as current.
+    """
+    current_game = _try_load_game(game_id)
+    if isinstance(current_game, CheckersError):
+        print(current_game.error_message)
+        return
+    for result in analyze_game_state(current_game.game_state, depth, max_workers=jobs):
+        if isinstance(result, CheckersError):
+            print(result.error_message)
+            continue
+        print(json.dumps(result.to_json_dict()), flush=True)
+
+
+@click.command(name="migrate-cache")
+def migrate_cache() -> None:
+    """Move games saved by older versions into the sharded games directory."""
+    moved_count = 0
+    for result in GameStateManager.migrate_flat_layout():
+        if isinstance(result, CheckersError):
+            print(result.error_message)
+            continue
+        moved_count += 1
+    print(f"Moved {moved_count} games")
+
+
 @click.command()
 @click.option("-g", "--game-id", type=uuid.UUID)
 def show(game_id: uuid.UUID | None) -> None:
@@ -112,17 +224,96 @@ def perform_move_sequence(game_id: uuid.UUID | None, move_path: list[str]) -> No
         return
 
     GameStateManager.save_game_state(current_game.game_id, new_game_state)
+    book_result = record_played_moves(
+        GameStateManager.opening_book(current_game.game_state.rule_set),
+        current_game.game_state,
+        position_sequence,
+    )
+    if isinstance(book_result, CheckersError):
+        print(book_result.error_message)
 
     print(f" Game: {current_game.game_id}")
     print(new_game_state.board_state)
     print(f"  -> {new_game_state.whose_turn} to play")
 
 
+@click.group()
+def book() -> None:
+    """Query and build the opening book."""
+
+
+@click.command(name="query")
+@click.option("-g", "--game-id", type=uuid.UUID)
+def query_book(game_id: uuid.UUID | None) -> None:
+    """Show book moves for the current position of a game. If no game id is provided, use game saved as current."""
+    current_game = _try_load_game(game_id)
+    if isinstance(current_game, CheckersError):
+        print(current_game.error_message)
+        return
+    game_state = current_game.game_state
+    book_moves = GameStateManager.opening_book(game_state.rule_set).lookup(
+        game_state.board_state,
+        game_state.whose_turn,
+    )
+    print(f" Game: {current_game.game_id}")
+    print(game_state.board_state)
+    if not book_moves:
+        print("  Position is not in the opening book")
+    for book_move in book_moves:
+        move_path_str = " ".join(str(position) for position in book_move.move_path)
+        print(f"  {move_path_str}  (played {book_move.count} times)")
+
+
+@click.command(name="import")
+@click.option("-r", "--rule-set", "rule_set_str", type=str, default="StandardRuleSet")
+@click.argument(
+    "corpus_file", type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path)
+)
+def import_book(rule_set_str: str, corpus_file: pathlib.Path) -> None:
+    """Add the openings of the games in CORPUS_FILE to the opening book.
+
+    CORPUS_FILE contains one game per line, as a JSON list of move paths, e.g. [["2,0", "3,1"], ["5,1", "4,0"]].
+    Every game is replayed from the initial position of the rule set.
+    """
+    rule_set = get_rule_set(rule_set_str)
+    if isinstance(rule_set, CheckersError):
+        print(rule_set.error_message)
+        return
+
+    entries = []
+    cache = MoveValidationCache()
+    with corpus_file.open() as corpus:
+        for line_number, line in enumerate(corpus, start=1):
+            if not line.strip():
+                continue
+            game_entries = _book_entries_from_corpus_line(rule_set, line, cache)
+            if isinstance(game_entries, CheckersError):
+                print(
+                    f"Skipping game on line {line_number}: {game_entries.error_message}"
+                )
+                continue
+            entries.extend(game_entries)
+
+    result = GameStateManager.opening_book(rule_set).record(entries)
+    if isinstance(result, CheckersError):
+        print(result.error_message)
+        return
+    print(f"Added {len(entries)} moves to the opening book")
+
+
+book.add_command(query_book)
+book.add_command(import_book)
+
 main.add_command(new)
 main.add_command(show)
 main.add_command(list_games)
 main.add_command(clear)
+main.add_command(prune)
+main.add_command(export)
+main.add_command(migrate_cache)
+main.add_command(analyze)
 main.add_command(perform_move_sequence)
+main.add_command(book)
 
 
 def _get_position_sequence_from_input_move_path(
@@ -139,6 +330,42 @@ def _get_position_sequence_from_input_move_path(
     return position_sequence
 
 
+def _list_game_details() -> None:
+    game_count = 0
+    for summary in GameStateManager.iter_game_summaries():
+        if isinstance(summary, CheckersError):
+            print(summary.error_message)
+            continue
+        game_count += 1
+        print(summary)
+    if not game_count:
+        print("Currently no saved games")
+
+
+def _book_entries_from_corpus_line(
+    rule_set: RuleSet,
+    line: str,
+    cache: MoveValidationCache,
+) -> list[tuple[int, list[Position]]] | CheckersError:
+    try:
+        move_path_strs = json.loads(line)
+    except json.JSONDecodeError as error:
+        return CheckersError(f"invalid JSON: {error}")
+    if not isinstance(move_path_strs, list) or not all(
+        isinstance(move_path_str, list)
+        and all(isinstance(position_str, str) for position_str in move_path_str)
+        for move_path_str in move_path_strs
+    ):
+        return CheckersError("a game must be a list of move paths of position strings")
+    move_paths = []
+    for move_path_str in move_path_strs:
+        move_path = _get_position_sequence_from_input_move_path(move_path_str)
+        if isinstance(move_path, CheckersError):
+            return move_path
+        move_paths.append(move_path)
+    return book_entries_from_game(rule_set, move_paths, cache)
+
+
 def _try_load_game(game_id: uuid.UUID | None) -> Game | CheckersError:
     """Retrieve game state.
 
@@ -0,0 +1,164 @@
+"""Evaluation of board positions.
+
+Positions are scored from the perspective of the white player: positive scores favor white,
+negative scores favor black. Evaluation works on packed boards, so that many positions can be
+scored with a handful of array operations.
+"""
+from abc import ABC, abstractmethod
+from dataclasses import astuple, dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from .board_state import BoardState, PieceType
+from .packed_board import BOARD_SIZE, PACKED_VALUES, PackedBoards, pack_boards
+
+FEATURE_NAMES = ("material", "queens", "advancement", "mobility", "back_rank_guards")
+"""Names of the columns returned by extract_features, in order."""
+
+_SOLDIER_STEPS = {
+    PieceType.WHITE_SOLDIER: ((1, -1), (1, 1)),
+    PieceType.BLACK_SOLDIER: ((-1, -1), (-1, 1)),
+}
+_QUEEN_STEPS = ((1, -1), (1, 1), (-1, -1), (-1, 1))
+
+
+@dataclass(frozen=True)
+class EvaluationWeights:
+    """Weight of every feature in the score of a position.
+
+    The field order matches FEATURE_NAMES.
+    """
+
+    material: float = 1.0
+    queens: float = 1.5
+    advancement: float = 0.05
+    mobility: float = 0.1
+    back_rank_guards: float = 0.2
+
+    def as_array(self) -> npt.NDArray[np.float64]:
+        """Return the weights as an array, in the order of FEATURE_NAMES."""
+        return np.array(astuple(self), dtype=np.float64)
+
+
+class Evaluator(ABC):
+    """Interface to a position evaluator."""
+
+    @abstractmethod
+    def evaluate_batch(self, packed_boards: PackedBoards) -> npt.NDArray[np.float64]:
+        """Score many packed boards at once.
+
+        Args:
+            packed_boards: int8 array of shape (n, 8, 8), as created by pack_boards
+
+        Returns:
+            array of shape (n,) with the score of every board
+        """
+
+    def evaluate(self, board_state: BoardState) -> float:
+        """Score a single board state.
+
+        Args:
+            board_state: the state of the board
+
+        Returns:
+            the score of the board
+        """
+        return float(self.evaluate_batch(pack_boards([board_state]))[0])
+
+
+class LinearEvaluator(Evaluator):
+    """Scores positions as a weighted sum of the features from extract_features."""
+
+    def __init__(self, weights: EvaluationWeights | None = None) -> None:
+        """Create an evaluator with the given weights.
+
+        Args:
+            weights: weight of every feature, defaults to EvaluationWeights()
+        """
+        self.weights = EvaluationWeights() if weights is None else weights
+
+    def evaluate_batch(self, packed_boards: PackedBoards) -> npt.NDArray[np.float64]:
+        """Score many packed boards at once.
+
+        Args:
+            packed_boards: int8 array of shape (n, 8, 8), as created by pack_boards
+
+        Returns:
+            array of shape (n,) with the score of every board
+        """
+        return extract_features(packed_boards) @ self.weights.as_array()
+
+
+def extract_features(packed_boards: PackedBoards) -> npt.NDArray[np.float64]:
+    """Compute the evaluation features of many packed boards.
+
+    Every feature is the difference between the white and the black value:
+    - material: number of pieces
+    - queens: number of queens
+    - advancement: rows soldiers have advanced from their own side of the board
+    - mobility: diagonal steps onto empty squares that pieces could take
+    - back_rank_guards: soldiers still on their own back rank
+
+    Args:
+        packed_boards: int8 array of shape (n, 8, 8), as created by pack_boards
+
+    Returns:
+        array of shape (n, len(FEATURE_NAMES))
+    """
+    masks = {
+        piece_type: packed_boards == value
+        for piece_type, value in PACKED_VALUES.items()
+    }
+    counts = {piece_type: mask.sum(axis=(1, 2)) for piece_type, mask in masks.items()}
+    empty = packed_boards == 0
+    rows = np.arange(BOARD_SIZE).reshape(1, BOARD_SIZE, 1)
+
+    white_soldiers = masks[PieceType.WHITE_SOLDIER]
+    black_soldiers = masks[PieceType.BLACK_SOLDIER]
+    material = (
+        counts[PieceType.WHITE_SOLDIER]
+        + counts[PieceType.WHITE_QUEEN]
+        - counts[PieceType.BLACK_SOLDIER]
+        - counts[PieceType.BLACK_QUEEN]
+    )
+    queens = counts[PieceType.WHITE_QUEEN] - counts[PieceType.BLACK_QUEEN]
+    advancement = (white_soldiers * rows).sum(axis=(1, 2)) - (
+        black_soldiers * (BOARD_SIZE - 1 - rows)
+    ).sum(axis=(1, 2))
+    mobility = (
+        _count_steps(white_soldiers, empty, _SOLDIER_STEPS[PieceType.WHITE_SOLDIER])
+        + _count_steps(masks[PieceType.WHITE_QUEEN], empty, _QUEEN_STEPS)
+        - _count_steps(black_soldiers, empty, _SOLDIER_STEPS[PieceType.BLACK_SOLDIER])
+        - _count_steps(masks[PieceType.BLACK_QUEEN], empty, _QUEEN_STEPS)
+    )
+    white_guards = white_soldiers[:, 0, :].sum(axis=1)
+    black_guards = black_soldiers[:, BOARD_SIZE - 1, :].sum(axis=1)
+    back_rank_guards = white_guards - black_guards
+
+    return np.stack(
+        [material, queens, advancement, mobility, back_rank_guards],
+        axis=1,
+    ).astype(np.float64)
+
+
+def _count_steps(
+    pieces: npt.NDArray[np.bool_],
+    empty: npt.NDArray[np.bool_],
+    steps: tuple[tuple[int, int], ...],
+) -> npt.NDArray[np.int64]:
+    """Count, per board, the steps from a piece onto an empty square inside the board."""
+    total = np.zeros(pieces.shape[0], dtype=np.int64)
+    for row_step, column_step in steps:
+        source = (
+            slice(None),
+            slice(max(0, -row_step), BOARD_SIZE - max(0, row_step)),
+            slice(max(0, -column_step), BOARD_SIZE - max(0, column_step)),
+        )
+        target = (
+            slice(None),
+            slice(max(0, row_step), BOARD_SIZE - max(0, -row_step)),
+            slice(max(0, column_step), BOARD_SIZE - max(0, -column_step)),
+        )
+        total += (pieces[source] & empty[target]).sum(axis=(1, 2))
+    return total
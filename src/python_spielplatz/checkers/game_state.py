@@ -1,36 +1,78 @@
-from copy import deepcopy
 from dataclasses import dataclass
+from functools import cached_property
 
 from .board_state import BoardState
 from .checkerserror import CheckersError
+from .move_validation_cache import MoveValidationCache
 from .movement import Move
 from .pieces import PieceColor
+from .position_hash import position_hash, switch_player_hash, updated_position_hash
 from .standard_rule_set import RuleSet
 
 
 @dataclass(frozen=True)
 class GameState:
-    """Holds the state of a game."""
+    """Holds the state of a game.
+
+    Game states are not changed once created, including their board: moves are made by creating
+    a new state with try_make_moves, which may hand the same state to several callers.
+
+    Params:
+    ply: number of turns played so far
+    """
 
     board_state: BoardState
     rule_set: RuleSet
     whose_turn: PieceColor
+    ply: int = 0
+
+    @cached_property
+    def position_key(self) -> int:
+        """position_hash of the board and the player to move.
+
+        Computed on first use, unless try_make_moves carried it over from the previous state.
+        """
+        return position_hash(self.board_state, self.whose_turn)
 
 
 def try_make_moves(
     moves: list[Move],
     game_state: GameState,
+    cache: MoveValidationCache | None = None,
 ) -> GameState | CheckersError:
     """Given a move and the current game state, return the resulting game state.
 
     Args:
         moves: a list of moves to make
         game_state: current state of the game
+        cache: cache of previously validated move sequences, by default moves are always validated
 
     Returns:
         If moves sequence is valid, the resulting game state, otherwise an Error
     """
-    board_state = deepcopy(game_state.board_state)
+    if cache is None:
+        return _make_moves(moves, game_state, track_position_key=False)
+    return cache.get_or_validate(
+        moves,
+        game_state,
+        lambda: _make_moves(moves, game_state, track_position_key=True),
+    )
+
+
+def _make_moves(
+    moves: list[Move],
+    game_state: GameState,
+    *,
+    track_position_key: bool,
+) -> GameState | CheckersError:
+    """Make the moves on a copy of the board.
+
+    With track_position_key, the position key of the new state is updated from the key of the
+    current state along with the board, so that it does not have to hash its whole board.
+    """
+    # positions and piece types are immutable, so copying the mapping copies the board
+    board_state = BoardState(occupancies=dict(game_state.board_state.occupancies))
+    position_key = game_state.position_key if track_position_key else 0
     for i, move in enumerate(moves, start=1):
         board_state_updates = game_state.rule_set.try_make_move(
             move,
@@ -41,10 +83,21 @@ def try_make_moves(
             return CheckersError(
                 f"Error encountered during move {i}: {board_state_updates.error_message}",
             )
+        if track_position_key:
+            position_key = updated_position_hash(
+                position_key,
+                board_state,
+                board_state_updates,
+            )
         board_state.update(board_state_updates)
 
-    return GameState(
+    next_game_state = GameState(
         rule_set=game_state.rule_set,
         board_state=board_state,
         whose_turn=game_state.whose_turn.next_up(),
+        ply=game_state.ply + 1,
     )
+    if track_position_key:
+        # fill in the cached property with the updated key
+        vars(next_game_state)["position_key"] = switch_player_hash(position_key)
+    return next_game_state
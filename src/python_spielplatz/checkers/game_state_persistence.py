@@ -1,9 +1,17 @@
+import contextlib
+import itertools
+import json
 import logging
+import os
 import pathlib
 import pickle
 import uuid
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from tempfile import gettempdir
+from typing import TypeVar
 from uuid import UUID
 
 import click
@@ -11,8 +19,22 @@ import click
 from python_spielplatz.checkers.board_state import BoardState
 from python_spielplatz.checkers.checkerserror import CheckersError
 from python_spielplatz.checkers.game_state import GameState
+from python_spielplatz.checkers.opening_book import OpeningBook
+from python_spielplatz.checkers.pieces import PieceColor
 from python_spielplatz.checkers.standard_rule_set import RuleSet
 
+CACHE_DIR_ENV_VAR = "CHECKERS_CACHE_DIR"
+"""Environment variable that overrides the directory where games and settings are stored."""
+
+BULK_MAX_WORKERS = 16
+"""Number of threads used to process saved games in bulk operations."""
+
+# datetime.UTC only exists since Python 3.11
+_UTC = timezone.utc  # noqa: UP017
+
+_Item = TypeVar("_Item")
+_Result = TypeVar("_Result")
+
 
 @dataclass
 class GlobalSettings:
@@ -29,15 +51,58 @@ class Game:
     game_state: GameState
 
 
+@dataclass
+class GameSummary:
+    """Overview of a saved game."""
+
+    game_id: UUID
+    whose_turn: PieceColor
+    ply: int
+    white_pieces: int
+    black_pieces: int
+    last_modified: datetime
+
+    def __str__(self) -> str:
+        """Convert to a single line str."""
+        return (
+            f"{self.game_id}  {self.whose_turn} to play  ply {self.ply}  "
+            f"white pieces {self.white_pieces}  black pieces {self.black_pieces}  "
+            f"last modified {self.last_modified:%Y-%m-%d %H:%M:%S}"
+        )
+
+
 class GameStateManager:
     """Manage game states.
 
     Save and load games states to temporary files and keep track of global game settings
+
+    Games are stored in subdirectories of the games directory, sharded by the first two characters of
+    their id, so that no single directory holds too many files.
     """
 
     _cli_cache_dir = "checkers_cache"
-    _cli_cache_dir_path = pathlib.Path(gettempdir(), _cli_cache_dir)
+    _cli_cache_dir_path = pathlib.Path(
+        os.environ.get(CACHE_DIR_ENV_VAR) or pathlib.Path(gettempdir(), _cli_cache_dir),
+    )
     _cli_cache_settings_path = pathlib.Path(_cli_cache_dir_path, "settings.pkl")
+    _cli_cache_games_path = pathlib.Path(_cli_cache_dir_path, "games")
+    _game_shard_prefix_length = 2
+
+    @classmethod
+    def get_cache_dir(cls) -> pathlib.Path:
+        """Return the directory where games and settings are stored."""
+        return cls._cli_cache_dir_path
+
+    @classmethod
+    def set_cache_dir(cls, cache_dir: pathlib.Path) -> None:
+        """Store games and settings in a different directory.
+
+        Args:
+            cache_dir: the new storage directory
+        """
+        cls._cli_cache_dir_path = cache_dir
+        cls._cli_cache_settings_path = pathlib.Path(cache_dir, "settings.pkl")
+        cls._cli_cache_games_path = pathlib.Path(cache_dir, "games")
 
     @classmethod
     def get_global_checkers_settings(cls) -> GlobalSettings | CheckersError:
@@ -89,9 +154,12 @@ class GameStateManager:
                 f"Could not retrieve default game from settings: {game_settings.error_message}",
             )
         game_id = game_settings.current_game_identifier
-        game_path = pathlib.Path(cls._cli_cache_dir_path, f"{game_id}.pkl")
+        game_path = cls._game_path(game_id)
         if not game_path.exists():
-            return CheckersError(f"Default game state file {game_path} does not exist")
+            return CheckersError(
+                f"Default game state file {game_path} does not exist"
+                f"{cls._migration_hint(game_id)}",
+            )
         with game_path.open("rb") as game_file:
             return Game(game_id=game_id, game_state=pickle.load(game_file))
 
@@ -105,10 +173,13 @@ class GameStateManager:
         Returns:
             GameState object if successful, Error otherwise
         """
-        game_path = pathlib.Path(cls._cli_cache_dir_path, f"{game_id}.pkl")
+        game_path = cls._game_path(game_id)
 
         if not game_path.exists():
-            return CheckersError(f"Expected game state file {game_path} does not exist")
+            return CheckersError(
+                f"Expected game state file {game_path} does not exist"
+                f"{cls._migration_hint(game_id)}",
+            )
 
         with game_path.open("rb") as game_file:
             return Game(game_id=game_id, game_state=pickle.load(game_file))
@@ -126,26 +197,141 @@ class GameStateManager:
                 cls._cli_cache_dir_path,
             )
             return []
-        path_strings = [str(path.stem) for path in cls._cli_cache_dir_path.iterdir()]
-        if "settings" in path_strings:
-            path_strings.remove("settings")
-        return path_strings
+        flat_layout_game_count = len(cls._flat_layout_game_paths())
+        if flat_layout_game_count:
+            logging.warning(
+                "%s games saved in an older layout are not listed. Run 'checkers migrate-cache' to"
+                " move them",
+                flat_layout_game_count,
+            )
+        return [str(path.stem) for path in cls._saved_game_paths()]
 
     @classmethod
     def clear_saved_games(cls) -> None:
-        """Deletes all saved game states and global settings."""
+        """Deletes all saved game states and global settings.
+
+        Games saved in the older flat layout are deleted as well. Opening books are kept.
+        """
         if not cls._cli_cache_dir_path.exists():
             return
-        paths = list(cls._cli_cache_dir_path.iterdir())
+        paths = cls._saved_game_paths() + cls._flat_layout_game_paths()
+        if cls._cli_cache_settings_path.exists():
+            paths.append(cls._cli_cache_settings_path)
         if not paths:
             return
         if click.confirm(
             f"Confirm deletion of these files within {cls._cli_cache_dir_path}",
         ):
-            for path in paths:
-                path.unlink()
+            for result in _map_concurrently(_try_unlink, paths):
+                if isinstance(result, CheckersError):
+                    logging.warning(result.error_message)
+            cls._remove_empty_shard_dirs()
         return
 
+    @classmethod
+    def iter_game_summaries(
+        cls,
+        max_workers: int = BULK_MAX_WORKERS,
+    ) -> Iterator[GameSummary | CheckersError]:
+        """Load all saved games concurrently and summarize them.
+
+        Args:
+            max_workers: number of games loaded at the same time
+
+        Yields:
+            a summary of every saved game, or an Error if a game could not be loaded, in the order
+            in which loading finishes
+        """
+        yield from _map_concurrently(
+            _try_load_game_summary,
+            cls._saved_game_paths(),
+            max_workers,
+        )
+
+    @classmethod
+    def prune_saved_games(
+        cls,
+        older_than: timedelta,
+        max_workers: int = BULK_MAX_WORKERS,
+    ) -> Iterator[UUID | CheckersError]:
+        """Delete all saved games that have not been modified for some time.
+
+        The game saved as current is never deleted.
+
+        Args:
+            older_than: games last modified longer ago than this are deleted
+            max_workers: number of games deleted at the same time
+
+        Yields:
+            the id of every deleted game, or an Error if a game could not be deleted
+        """
+        cutoff = datetime.now(tz=_UTC) - older_than
+        game_settings = cls.get_global_checkers_settings()
+        current_game_path = (
+            None
+            if isinstance(game_settings, CheckersError)
+            else cls._game_path(game_settings.current_game_identifier)
+        )
+
+        def try_prune(path: pathlib.Path) -> UUID | CheckersError | None:
+            try:
+                game_id = UUID(path.stem)
+            except ValueError:
+                return CheckersError(
+                    f"Skipping file {path}, it is not named after a game id",
+                )
+            try:
+                last_modified = datetime.fromtimestamp(path.stat().st_mtime, tz=_UTC)
+            except OSError:
+                return CheckersError(f"Error reading game state file {path}")
+            if path == current_game_path or last_modified >= cutoff:
+                return None
+            unlink_result = _try_unlink(path)
+            if isinstance(unlink_result, CheckersError):
+                return unlink_result
+            return game_id
+
+        for result in _map_concurrently(
+            try_prune, cls._saved_game_paths(), max_workers
+        ):
+            if result is not None:
+                yield result
+
+    @classmethod
+    def export_saved_games(
+        cls,
+        destination: pathlib.Path,
+        max_workers: int = BULK_MAX_WORKERS,
+    ) -> Iterator[UUID | CheckersError]:
+        """Export all saved games to a JSON lines file.
+
+        Every line holds one game, with its id, rule set, whose turn it is, ply, and the
+        occupancies of the board as a mapping from "<row>,<column>" to piece type name.
+
+        Args:
+            destination: path of the file to write
+            max_workers: number of games loaded at the same time
+
+        Yields:
+            the id of every exported game, or an Error if a game could not be exported
+        """
+        try:
+            export_file = destination.open("w")
+        except OSError:
+            yield CheckersError(f"Error opening export file {destination}")
+            return
+        with export_file:
+            for game in _map_concurrently(
+                _try_load_game_file,
+                cls._saved_game_paths(),
+                max_workers,
+            ):
+                if isinstance(game, CheckersError):
+                    yield game
+                    continue
+                export_file.write(json.dumps(_game_to_json_dict(game)) + "\n")
+                yield game.game_id
+
     @classmethod
     def save_game_state(
         cls,
@@ -161,15 +347,13 @@ class GameStateManager:
         Returns:
             None if successful, Error otherwise
         """
+        game_path = cls._game_path(game_id)
         try:
-            cls._cli_cache_dir_path.mkdir(parents=True, exist_ok=True)
-            game_path = pathlib.Path(cls._cli_cache_dir_path, f"{game_id}.pkl")
+            game_path.parent.mkdir(parents=True, exist_ok=True)
             with game_path.open("wb") as game_file:
                 pickle.dump(game_state, game_file)
         except OSError:
-            return CheckersError(
-                f"Error writing to game state file {cls._cli_cache_settings_path}",
-            )
+            return CheckersError(f"Error writing to game state file {game_path}")
         return None
 
     @classmethod
@@ -197,3 +381,174 @@ class GameStateManager:
         if isinstance(save_result, CheckersError):
             return save_result
         return Game(game_id=game_id, game_state=game_state)
+
+    @classmethod
+    def opening_book(cls, rule_set: RuleSet) -> OpeningBook:
+        """Get the opening book for a rule set.
+
+        Args:
+            rule_set: the rule set the book's games are played with
+
+        Returns:
+            the opening book, stored alongside the saved games
+        """
+        return OpeningBook(
+            pathlib.Path(cls._cli_cache_dir_path, f"{type(rule_set).__name__}.book"),
+        )
+
+    @classmethod
+    def migrate_flat_layout(
+        cls,
+        max_workers: int = BULK_MAX_WORKERS,
+    ) -> Iterator[UUID | CheckersError]:
+        """Move games saved directly in the cache directory into the sharded games directory.
+
+        Args:
+            max_workers: number of games moved at the same time
+
+        Yields:
+            the id of every moved game, or an Error if a game could not be moved
+        """
+
+        def try_move(path: pathlib.Path) -> UUID | CheckersError:
+            try:
+                game_id = UUID(path.stem)
+            except ValueError:
+                return CheckersError(f"File {path} is not named after a game id")
+            game_path = cls._game_path(game_id)
+            try:
+                game_path.parent.mkdir(parents=True, exist_ok=True)
+                path.replace(game_path)
+            except OSError:
+                return CheckersError(f"Error moving {path} to {game_path}")
+            return game_id
+
+        yield from _map_concurrently(
+            try_move, cls._flat_layout_game_paths(), max_workers
+        )
+
+    @classmethod
+    def _game_path(cls, game_id: UUID) -> pathlib.Path:
+        game_id_str = str(game_id)
+        return pathlib.Path(
+            cls._cli_cache_games_path,
+            game_id_str[: cls._game_shard_prefix_length],
+            f"{game_id_str}.pkl",
+        )
+
+    @classmethod
+    def _saved_game_paths(cls) -> list[pathlib.Path]:
+        return list(cls._cli_cache_games_path.glob("*/*.pkl"))
+
+    @classmethod
+    def _flat_layout_game_paths(cls) -> list[pathlib.Path]:
+        return [
+            path
+            for path in cls._cli_cache_dir_path.glob("*.pkl")
+            if path != cls._cli_cache_settings_path
+        ]
+
+    @classmethod
+    def _remove_empty_shard_dirs(cls) -> None:
+        for shard_path in cls._cli_cache_games_path.glob("*/"):
+            with contextlib.suppress(OSError):
+                shard_path.rmdir()
+        with contextlib.suppress(OSError):
+            cls._cli_cache_games_path.rmdir()
+
+    @classmethod
+    def _migration_hint(cls, game_id: UUID) -> str:
+        if pathlib.Path(cls._cli_cache_dir_path, f"{game_id}.pkl").exists():
+            return ", but a game with this id was saved in an older layout. Run 'checkers migrate-cache' to move it"
+        return ""
+
+
+def _map_concurrently(
+    function: Callable[[_Item], _Result],
+    items: Iterable[_Item],
+    max_workers: int = BULK_MAX_WORKERS,
+) -> Iterator[_Result]:
+    """Apply function to all items in a thread pool, yielding results as they complete.
+
+    At most 2 * max_workers items are submitted at any time, so memory use stays bounded for
+    any number of items.
+    """
+    items_iterator = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: set[Future[_Result]] = set()
+        while True:
+            for item in itertools.islice(
+                items_iterator, 2 * max_workers - len(pending)
+            ):
+                pending.add(executor.submit(function, item))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _try_unlink(path: pathlib.Path) -> None | CheckersError:
+    try:
+        path.unlink()
+    except OSError:
+        return CheckersError(f"Error deleting file {path}")
+    return None
+
+
+def _try_load_game_file(path: pathlib.Path) -> Game | CheckersError:
+    try:
+        game_id = UUID(path.stem)
+        with path.open("rb") as game_file:
+            game_state = pickle.load(game_file)
+    # unpickling raises whatever the reconstructed objects raise, e.g. for a missing module
+    except (
+        OSError,
+        ValueError,
+        EOFError,
+        pickle.UnpicklingError,
+        AttributeError,
+        ImportError,
+        TypeError,
+        IndexError,
+        KeyError,
+    ):
+        return CheckersError(f"Error reading game state file {path}")
+    if not isinstance(game_state, GameState):
+        return CheckersError(f"Game state file {path} does not hold a game state")
+    return Game(game_id=game_id, game_state=game_state)
+
+
+def _try_load_game_summary(path: pathlib.Path) -> GameSummary | CheckersError:
+    game = _try_load_game_file(path)
+    if isinstance(game, CheckersError):
+        return game
+    try:
+        last_modified = datetime.fromtimestamp(path.stat().st_mtime, tz=_UTC)
+    except OSError:
+        return CheckersError(f"Error reading game state file {path}")
+    piece_colors = [
+        piece_type.value.color
+        for piece_type in game.game_state.board_state.occupancies.values()
+    ]
+    return GameSummary(
+        game_id=game.game_id,
+        whose_turn=game.game_state.whose_turn,
+        ply=game.game_state.ply,
+        white_pieces=piece_colors.count(PieceColor.WHITE),
+        black_pieces=piece_colors.count(PieceColor.BLACK),
+        last_modified=last_modified,
+    )
+
+
+def _game_to_json_dict(game: Game) -> dict[str, object]:
+    return {
+        "game_id": str(game.game_id),
+        "rule_set": type(game.game_state.rule_set).__name__,
+        "whose_turn": str(game.game_state.whose_turn),
+        "ply": game.game_state.ply,
+        "occupancies": {
+            str(position): piece_type.name
+            for position, piece_type in game.game_state.board_state.occupancies.items()
+        },
+    }
@@ -0,0 +1,127 @@
+"""A bounded cache of the results of move sequence validation."""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .checkerserror import CheckersError
+from .movement import Move
+from .rule_set_interface import RuleSet
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .game_state import GameState
+
+DEFAULT_MAX_SIZE = 4096
+"""Number of validated move sequences kept by default."""
+
+_CacheKey = tuple[int, int, type[RuleSet], tuple[Move, ...]]
+
+
+@dataclass(frozen=True)
+class CacheStatistics:
+    """Usage counters of a cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class MoveValidationCache:
+    """Least recently used cache of validated move sequences.
+
+    Entries are keyed by the position key of the game state the moves start from, which covers
+    the board and the player making the moves, its ply, the rule set, and the moves themselves.
+    The board is never hashed or compared by the cache: game states carry their position key,
+    and try_make_moves computes the key of a new state from the few positions the moves change.
+    Two positions with the same 64 bit key would share entries, which is negligibly rare for a
+    cache of this size.
+
+    The cached result is the resulting game state, which is returned as is to every caller
+    making the same moves, or the error the moves were rejected with. A cache can be shared
+    between threads.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_size: number of entries kept before the least recently used entry is evicted
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict[_CacheKey, GameState | CheckersError] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get_or_validate(
+        self,
+        moves: list[Move],
+        game_state: GameState,
+        validate: Callable[[], GameState | CheckersError],
+    ) -> GameState | CheckersError:
+        """Look up the result of a move sequence, validating and storing it if it is not cached.
+
+        Args:
+            moves: the moves to make
+            game_state: the state the moves are made from
+            validate: called on a cache miss, returns the game state after the moves or the error
+                the moves were rejected with
+
+        Returns:
+            the game state after the moves, or the error the moves were rejected with
+        """
+        key = (
+            game_state.position_key,
+            game_state.ply,
+            type(game_state.rule_set),
+            tuple(moves),
+        )
+        with self._lock:
+            cached_result = self._entries.get(key)
+            if cached_result is not None:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return cached_result
+            self._misses += 1
+
+        # validate without holding the lock, so that other threads are not blocked meanwhile
+        result = validate()
+        if self.max_size <= 0:
+            return result
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return result
+
+    def statistics(self) -> CacheStatistics:
+        """Return the usage counters of the cache."""
+        with self._lock:
+            return CacheStatistics(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+            )
+
+    def clear(self) -> None:
+        """Remove all entries and reset the usage counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
@@ -0,0 +1,390 @@
+"""An opening book of moves played from known positions."""
+import bisect
+import itertools
+import mmap
+import os
+import pathlib
+import struct
+import sys
+import tempfile
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from .board_state import BoardState, Position
+from .checkerserror import CheckersError
+from .game_state import GameState, try_make_moves
+from .move_validation_cache import MoveValidationCache
+from .movement import Move
+from .pieces import PieceColor
+from .position_hash import position_hash
+from .rule_set_interface import RuleSet
+
+BOOK_MAX_PLY = 16
+"""Moves are only recorded in the book for the first plies of a game."""
+
+BOOK_DELTA_MERGE_RECORDS = 4096
+"""Number of recorded moves collected in the delta file before it is merged into the book."""
+
+BOOK_MAX_PATH_LENGTH = 12
+"""Longest move path (number of positions, including the start) that can be stored in the book."""
+
+MIN_MOVE_PATH_LENGTH = 2
+"""Shortest move path that is a move: a starting position and one target position."""
+
+_BOARD_SIZE = 8
+_EMPTY_SQUARE = 0xFF
+# record layout: position hash, move path as square indices (row * 8 + column), count
+_RECORD = struct.Struct(f"<Q{BOOK_MAX_PATH_LENGTH}sI")
+
+
+@dataclass(frozen=True)
+class BookMove:
+    """A move path played from a position, and how often it was played."""
+
+    move_path: tuple[Position, ...]
+    count: int
+
+    def moves(self) -> list[Move]:
+        """Convert the move path to a list of moves."""
+        return [
+            Move(starting_position=position_start, target_position=position_end)
+            for position_start, position_end in itertools.pairwise(self.move_path)
+        ]
+
+
+class OpeningBook:
+    """Move statistics keyed by position hash.
+
+    The book is stored on disk as a sorted array of fixed size records. Lookups binary search a
+    memory map of the file, so only the pages touched by the search are read.
+
+    New moves are appended to a delta file next to the book, which is merged into the sorted
+    records once it holds delta_merge_records records. Appends and merges hold a lock on the
+    book, so concurrent processes can record moves without losing updates. The delta is parsed
+    once per instance, later lookups only read the records appended since.
+    """
+
+    def __init__(
+        self,
+        book_path: pathlib.Path,
+        delta_merge_records: int = BOOK_DELTA_MERGE_RECORDS,
+    ) -> None:
+        """Create an opening book backed by the file at book_path.
+
+        Args:
+            book_path: location of the book file. The file is created on the first merge.
+            delta_merge_records: number of records in the delta file that triggers a merge
+        """
+        self.book_path = book_path
+        self.delta_path = book_path.with_name(f"{book_path.name}.delta")
+        self.delta_merge_records = delta_merge_records
+        self._lock_path = book_path.with_name(f"{book_path.name}.lock")
+        self._mapping: mmap.mmap | None = None
+        self._mapped_file_id: tuple[int, int] | None = None
+        self._delta_counts: dict[int, Counter[bytes]] = {}
+        self._delta_file_id: tuple[tuple[int, int] | None, int] | None = None
+        self._delta_offset = 0
+
+    def lookup(self, board_state: BoardState, whose_turn: PieceColor) -> list[BookMove]:
+        """Find all book moves for a position.
+
+        Args:
+            board_state: the state of the board
+            whose_turn: color of the player whose turn it is
+
+        Returns:
+            book moves for the position, most frequently played first
+        """
+        key = position_hash(board_state, whose_turn)
+        counts: Counter[bytes] = Counter()
+        mapping = self._get_mapping()
+        if mapping is not None:
+            record_count = len(mapping) // _RECORD.size
+            first = bisect.bisect_left(
+                range(record_count),
+                key,
+                key=lambda i: _RECORD.unpack_from(mapping, i * _RECORD.size)[0],
+            )
+            for i in range(first, record_count):
+                record_key, squares, count = _RECORD.unpack_from(
+                    mapping,
+                    i * _RECORD.size,
+                )
+                if record_key != key:
+                    break
+                counts[squares] += count
+        counts.update(self._get_delta_counts().get(key, Counter()))
+        return [
+            BookMove(move_path=_decode_move_path(squares), count=count)
+            for squares, count in counts.most_common()
+        ]
+
+    def suggest_moves(
+        self,
+        board_state: BoardState,
+        whose_turn: PieceColor,
+    ) -> list[Move] | None:
+        """Return the most frequently played moves for a position.
+
+        Meant to be consulted before searching a position.
+
+        Args:
+            board_state: the state of the board
+            whose_turn: color of the player whose turn it is
+
+        Returns:
+            list of moves to play, or None if the position is not in the book
+        """
+        book_moves = self.lookup(board_state, whose_turn)
+        if not book_moves:
+            return None
+        return book_moves[0].moves()
+
+    def record(
+        self,
+        entries: Iterable[tuple[int, list[Position]]],
+    ) -> None | CheckersError:
+        """Add played moves to the book.
+
+        Move paths that are too short or too long, or leave the 8x8 board, are not recorded.
+
+        Args:
+            entries: pairs of (position hash, move path played from that position)
+
+        Returns:
+            None if successful, Error otherwise
+        """
+        records = b"".join(
+            _RECORD.pack(key, squares, 1)
+            for key, move_path in entries
+            if (squares := _encode_move_path(move_path)) is not None
+        )
+        if not records:
+            return None
+        try:
+            self.book_path.parent.mkdir(parents=True, exist_ok=True)
+            with _file_lock(self._lock_path):
+                with self.delta_path.open("ab") as delta_file:
+                    delta_file.write(records)
+                    delta_size = delta_file.tell()
+                if delta_size >= self.delta_merge_records * _RECORD.size:
+                    self._merge_delta()
+        except OSError:
+            return CheckersError(f"Error writing to opening book file {self.book_path}")
+        return None
+
+    def merge(self) -> None | CheckersError:
+        """Merge all recorded moves from the delta file into the sorted book file.
+
+        Returns:
+            None if successful, Error otherwise
+        """
+        try:
+            self.book_path.parent.mkdir(parents=True, exist_ok=True)
+            with _file_lock(self._lock_path):
+                self._merge_delta()
+        except OSError:
+            return CheckersError(f"Error writing to opening book file {self.book_path}")
+        return None
+
+    def close(self) -> None:
+        """Release the memory map of the book file."""
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+            self._mapped_file_id = None
+
+    def _merge_delta(self) -> None:
+        """Rewrite the book with the delta records included. The caller must hold the lock."""
+        counts = Counter(
+            {
+                (key, squares): count
+                for key, squares, count in self._iter_book_records()
+            },
+        )
+        for key, squares, count in self._iter_delta_records():
+            counts[(key, squares)] += count
+        with tempfile.NamedTemporaryFile(
+            dir=self.book_path.parent,
+            prefix=f"{self.book_path.name}.",
+            suffix=".tmp",
+            delete=False,
+        ) as temporary_file:
+            for (key, squares), count in sorted(counts.items()):
+                temporary_file.write(_RECORD.pack(key, squares, count))
+        pathlib.Path(temporary_file.name).replace(self.book_path)
+        self.delta_path.unlink(missing_ok=True)
+        self.close()
+
+    def _get_mapping(self) -> mmap.mmap | None:
+        """Map the book file, remapping it if another process replaced it since."""
+        try:
+            book_stat = self.book_path.stat()
+        except FileNotFoundError:
+            self.close()
+            return None
+        file_id = (book_stat.st_ino, book_stat.st_mtime_ns)
+        if self._mapping is not None and file_id != self._mapped_file_id:
+            self.close()
+        if self._mapping is None and book_stat.st_size > 0:
+            with self.book_path.open("rb") as book_file:
+                self._mapping = mmap.mmap(
+                    book_file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            self._mapped_file_id = file_id
+        return self._mapping
+
+    def _get_delta_counts(self) -> dict[int, Counter[bytes]]:
+        """Counts of the delta records by position hash, parsing only newly appended records."""
+        self._get_mapping()
+        try:
+            with self.delta_path.open("rb") as delta_file:
+                delta_stat = os.fstat(delta_file.fileno())
+                # a merge replaces the book and starts a new delta file
+                delta_file_id = (self._mapped_file_id, delta_stat.st_ino)
+                if (
+                    delta_file_id != self._delta_file_id
+                    or delta_stat.st_size < self._delta_offset
+                ):
+                    self._delta_counts = {}
+                    self._delta_file_id = delta_file_id
+                    self._delta_offset = 0
+                delta_file.seek(self._delta_offset)
+                delta = delta_file.read(delta_stat.st_size - self._delta_offset)
+        except FileNotFoundError:
+            self._delta_counts = {}
+            self._delta_file_id = None
+            self._delta_offset = 0
+            return self._delta_counts
+        # a record that is still being appended by another process is parsed on a later lookup
+        complete_size = len(delta) - len(delta) % _RECORD.size
+        for key, squares, count in _RECORD.iter_unpack(delta[:complete_size]):
+            self._delta_counts.setdefault(key, Counter())[squares] += count
+        self._delta_offset += complete_size
+        return self._delta_counts
+
+    def _iter_book_records(self) -> Iterator[tuple[int, bytes, int]]:
+        mapping = self._get_mapping()
+        if mapping is None:
+            return
+        yield from _RECORD.iter_unpack(mapping)
+
+    def _iter_delta_records(self) -> Iterator[tuple[int, bytes, int]]:
+        try:
+            delta = self.delta_path.read_bytes()
+        except FileNotFoundError:
+            return
+        # a record that is still being appended by another process is skipped
+        yield from _RECORD.iter_unpack(delta[: len(delta) - len(delta) % _RECORD.size])
+
+
+def record_played_moves(
+    book: OpeningBook,
+    game_state: GameState,
+    move_path: list[Position],
+) -> None | CheckersError:
+    """Record a move path played from a game state, if the game is still in its opening.
+
+    Args:
+        book: the book to update
+        game_state: the state of the game before the move
+        move_path: the positions the piece moved through
+
+    Returns:
+        None if successful, if the move is beyond the opening, or if the move path is not a move,
+        Error otherwise
+    """
+    if game_state.ply >= BOOK_MAX_PLY:
+        return None
+    return book.record(
+        [(position_hash(game_state.board_state, game_state.whose_turn), move_path)],
+    )
+
+
+def book_entries_from_game(
+    rule_set: RuleSet,
+    move_paths: list[list[Position]],
+    cache: MoveValidationCache | None = None,
+) -> list[tuple[int, list[Position]]] | CheckersError:
+    """Replay a game from the initial position and collect book entries for its opening.
+
+    Args:
+        rule_set: the rule set the game was played with
+        move_paths: the move path of every turn of the game, in order
+        cache: cache of validated move sequences, shared between games with common openings
+
+    Returns:
+        (position hash, move path) pairs for the first plies of the game, Error if a move is illegal
+    """
+    game_state = GameState(
+        rule_set=rule_set,
+        board_state=BoardState(occupancies=rule_set.initial_game_occupancies()),
+        whose_turn=rule_set.first_player(),
+    )
+    entries = []
+    for move_path in move_paths[:BOOK_MAX_PLY]:
+        if len(move_path) < MIN_MOVE_PATH_LENGTH:
+            return CheckersError(
+                f"Error in turn {game_state.ply + 1}: a move path needs at least"
+                f" {MIN_MOVE_PATH_LENGTH} positions",
+            )
+        moves = [
+            Move(starting_position=position_start, target_position=position_end)
+            for position_start, position_end in itertools.pairwise(move_path)
+        ]
+        next_game_state = try_make_moves(moves, game_state, cache=cache)
+        if isinstance(next_game_state, CheckersError):
+            return CheckersError(
+                f"Error in turn {game_state.ply + 1}: {next_game_state.error_message}",
+            )
+        entries.append((game_state.position_key, move_path))
+        game_state = next_game_state
+    return entries
+
+
+def _encode_move_path(move_path: list[Position]) -> bytes | None:
+    if not MIN_MOVE_PATH_LENGTH <= len(move_path) <= BOOK_MAX_PATH_LENGTH:
+        return None
+    if any(
+        not (0 <= position.row < _BOARD_SIZE and 0 <= position.column < _BOARD_SIZE)
+        for position in move_path
+    ):
+        return None
+    squares = bytes(
+        position.row * _BOARD_SIZE + position.column for position in move_path
+    )
+    return squares.ljust(BOOK_MAX_PATH_LENGTH, bytes([_EMPTY_SQUARE]))
+
+
+def _decode_move_path(squares: bytes) -> tuple[Position, ...]:
+    return tuple(
+        Position(row=square // _BOARD_SIZE, column=square % _BOARD_SIZE)
+        for square in squares
+        if square != _EMPTY_SQUARE
+    )
+
+
+@contextmanager
+def _file_lock(lock_path: pathlib.Path) -> Iterator[None]:
+    """Hold an exclusive lock on lock_path, shared by all processes using the same book."""
+    with lock_path.open("a+b") as lock_file:
+        if sys.platform == "win32":
+            import msvcrt
+
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
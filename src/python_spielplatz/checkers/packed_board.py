@@ -0,0 +1,88 @@
+"""A packed array form of the board, for vectorized processing of many positions."""
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from .board_state import BoardState, PieceType, Position
+
+BOARD_SIZE = 8
+
+PACKED_EMPTY = 0
+PACKED_VALUES = {
+    PieceType.WHITE_SOLDIER: 1,
+    PieceType.WHITE_QUEEN: 2,
+    PieceType.BLACK_SOLDIER: -1,
+    PieceType.BLACK_QUEEN: -2,
+}
+"""Value stored for each piece type. White pieces are positive, black pieces negative."""
+
+_PIECE_TYPES_BY_VALUE = {
+    value: piece_type for piece_type, value in PACKED_VALUES.items()
+}
+
+PackedBoards = npt.NDArray[np.int8]
+
+
+def pack_board(board_state: BoardState) -> PackedBoards:
+    """Pack a board state into an 8x8 array, indexed by [row, column].
+
+    Pieces outside the 8x8 board cannot be represented and are left out.
+
+    Args:
+        board_state: the state of the board
+
+    Returns:
+        int8 array of shape (8, 8) holding the packed value of the piece on every square
+    """
+    packed_board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=np.int8)
+    on_board = [
+        (position, piece_type)
+        for position, piece_type in board_state.occupancies.items()
+        if 0 <= position.row < BOARD_SIZE and 0 <= position.column < BOARD_SIZE
+    ]
+    if on_board:
+        rows, columns, values = zip(
+            *(
+                (position.row, position.column, PACKED_VALUES[piece_type])
+                for position, piece_type in on_board
+            ),
+            strict=True,
+        )
+        packed_board[rows, columns] = values
+    return packed_board
+
+
+def pack_boards(board_states: Sequence[BoardState]) -> PackedBoards:
+    """Pack many board states into one array.
+
+    Args:
+        board_states: the board states to pack
+
+    Returns:
+        int8 array of shape (len(board_states), 8, 8)
+    """
+    packed_boards = np.zeros((len(board_states), BOARD_SIZE, BOARD_SIZE), dtype=np.int8)
+    for i, board_state in enumerate(board_states):
+        packed_boards[i] = pack_board(board_state)
+    return packed_boards
+
+
+def unpack_board(packed_board: PackedBoards) -> BoardState:
+    """Convert a packed 8x8 array back into a board state.
+
+    Args:
+        packed_board: int8 array of shape (8, 8), as created by pack_board
+
+    Returns:
+        the board state with a piece on every non-empty square
+    """
+    rows, columns = np.nonzero(packed_board)
+    return BoardState(
+        occupancies={
+            Position(row=int(row), column=int(column)): _PIECE_TYPES_BY_VALUE[
+                int(packed_board[row, column])
+            ]
+            for row, column in zip(rows, columns, strict=True)
+        },
+    )
@@ -0,0 +1,82 @@
+"""Stable hashing of board positions."""
+import hashlib
+from functools import cache, lru_cache
+
+from .board_state import BoardState, BoardStateUpdates, PieceType
+from .pieces import PieceColor
+
+
+def position_hash(board_state: BoardState, whose_turn: PieceColor) -> int:
+    """Compute a 64 bit zobrist hash of a board position and the player to move.
+
+    Unlike the builtin hash, the result is the same in every process, so it can be used as a key
+    in on-disk indexes.
+
+    Args:
+        board_state: the state of the board
+        whose_turn: color of the player whose turn it is
+
+    Returns:
+        an unsigned 64 bit integer identifying the position
+    """
+    hash_value = _black_to_move_key() if whose_turn == PieceColor.BLACK else 0
+    for position, piece_type in board_state.occupancies.items():
+        hash_value ^= _square_key(position.row, position.column, piece_type)
+    return hash_value
+
+
+def updated_position_hash(
+    hash_value: int,
+    board_state: BoardState,
+    board_state_updates: BoardStateUpdates,
+) -> int:
+    """Compute the hash of a position after a board update from the hash before the update.
+
+    Only the updated positions are hashed, instead of every piece on the board.
+
+    Args:
+        hash_value: position_hash of board_state
+        board_state: the state of the board, before the updates are applied
+        board_state_updates: the updates to apply
+
+    Returns:
+        the hash of the updated board, with the same player to move
+    """
+    for position, piece_type in board_state_updates.occupancy_updates.items():
+        previous_piece_type = board_state.occupancies.get(position)
+        if previous_piece_type is not None:
+            hash_value ^= _square_key(
+                position.row,
+                position.column,
+                previous_piece_type,
+            )
+        if piece_type is not None:
+            hash_value ^= _square_key(position.row, position.column, piece_type)
+    return hash_value
+
+
+def switch_player_hash(hash_value: int) -> int:
+    """Compute the hash of the same board with the other player to move.
+
+    Args:
+        hash_value: position_hash of a board and a player to move
+
+    Returns:
+        the hash of the board with the other player to move
+    """
+    return hash_value ^ _black_to_move_key()
+
+
+@cache
+def _square_key(row: int, column: int, piece_type: PieceType) -> int:
+    return _stable_key(f"{row},{column},{piece_type.name}")
+
+
+@lru_cache(maxsize=1)
+def _black_to_move_key() -> int:
+    return _stable_key("black-to-move")
+
+
+def _stable_key(label: str) -> int:
+    digest = hashlib.blake2b(label.encode(), digest_size=8, person=b"checkers").digest()
+    return int.from_bytes(digest, "little")
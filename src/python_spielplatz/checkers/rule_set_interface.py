@@ -36,6 +36,22 @@ class RuleSet(ABC):
             Board state updates if move is legal, CheckersError if move is illegal.
         """
 
+    @staticmethod
+    @abstractmethod
+    def legal_move_sequences(
+        board_state: BoardState,
+        current_player: PieceColor,
+    ) -> list[list[Move]]:
+        """List every move sequence the current player could make in one turn.
+
+        Args:
+            board_state: the current state of the board
+            current_player: color of player whose turn it is
+
+        Returns:
+            list of move sequences, each of which is accepted by try_make_move move by move
+        """
+
     @staticmethod
     @abstractmethod
     def initial_game_occupancies() -> dict[Position, PieceType]:
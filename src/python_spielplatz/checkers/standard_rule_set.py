@@ -6,9 +6,11 @@ from .board_state import (
 )
 from .checkerserror import CheckersError
 from .movement import Move
-from .pieces import PieceColor
+from .pieces import Piece, PieceColor, Rank
 from .rule_set_interface import RuleSet
 
+_BOARD_SIZE = 8
+
 
 class StandardRuleSet(RuleSet):
     """The standard rule set.
@@ -57,6 +59,43 @@ class StandardRuleSet(RuleSet):
             },
         )
 
+    @staticmethod
+    def legal_move_sequences(
+        board_state: BoardState,
+        current_player: PieceColor,
+    ) -> list[list[Move]]:
+        """List every move sequence the current player could make in one turn.
+
+        Only positions on the 8x8 board are considered. A capture sequence may stop
+        after any capture, and every enemy piece can be jumped at most once per sequence.
+
+        Args:
+            board_state: the current state of the board
+            current_player: color of player whose turn it is
+
+        Returns:
+            list of move sequences, each of which is accepted by try_make_move move by move
+        """
+        move_sequences = []
+        for position, piece_type in board_state.occupancies.items():
+            piece = piece_type.value
+            if piece.color != current_player:
+                continue
+            for row_step, column_step in _directions(piece):
+                target_position = Position(
+                    position.row + row_step,
+                    position.column + column_step,
+                )
+                if (
+                    _is_on_board(target_position)
+                    and target_position not in board_state.occupancies
+                ):
+                    move_sequences.append([Move(position, target_position)])
+            move_sequences.extend(
+                _capture_sequences(board_state, position, piece),
+            )
+        return move_sequences
+
     @staticmethod
     def initial_game_occupancies() -> dict[Position, PieceType]:
         """Return the occupancies of the board at the beginning of the game."""
@@ -72,3 +111,66 @@ class StandardRuleSet(RuleSet):
     def first_player() -> PieceColor:
         """which player color is allowed to go first."""
         return PieceColor.WHITE
+
+
+def _directions(piece: Piece) -> list[tuple[int, int]]:
+    """Diagonal directions a piece may move in, as (row step, column step)."""
+    if piece.rank == Rank.QUEEN:
+        return [(1, -1), (1, 1), (-1, -1), (-1, 1)]
+    forward = 1 if piece.color == PieceColor.WHITE else -1
+    return [(forward, -1), (forward, 1)]
+
+
+def _is_on_board(position: Position) -> bool:
+    return 0 <= position.row < _BOARD_SIZE and 0 <= position.column < _BOARD_SIZE
+
+
+def _capture_sequences(
+    board_state: BoardState,
+    starting_position: Position,
+    piece: Piece,
+) -> list[list[Move]]:
+    """All capture sequences of the piece at starting_position."""
+
+    def continue_sequences(
+        current_position: Position,
+        moves_so_far: list[Move],
+        captured_positions: set[Position],
+    ) -> list[list[Move]]:
+        """All capture sequences that continue moves_so_far from current_position."""
+        sequences = []
+        for row_step, column_step in _directions(piece):
+            captured_position = Position(
+                current_position.row + row_step,
+                current_position.column + column_step,
+            )
+            target_position = Position(
+                current_position.row + 2 * row_step,
+                current_position.column + 2 * column_step,
+            )
+            captured_piece_type = board_state.occupancies.get(captured_position)
+            if (
+                captured_piece_type is None
+                or captured_piece_type.value.color == piece.color
+                or captured_position in captured_positions
+                or not _is_on_board(target_position)
+            ):
+                continue
+            # the moving piece has left its starting position, captured pieces stay on the board
+            if (
+                target_position != starting_position
+                and target_position in board_state.occupancies
+            ):
+                continue
+            sequence = [*moves_so_far, Move(current_position, target_position)]
+            sequences.append(sequence)
+            sequences.extend(
+                continue_sequences(
+                    target_position,
+                    sequence,
+                    captured_positions | {captured_position},
+                ),
+            )
+        return sequences
+
+    return continue_sequences(starting_position, [], set())
@@ -0,0 +1,15 @@
+"""Fixtures shared by the tests."""
+import pathlib
+from collections.abc import Iterator
+
+import pytest
+from python_spielplatz.checkers.game_state_persistence import GameStateManager
+
+
+@pytest.fixture()
+def cache_dir(tmp_path: pathlib.Path) -> Iterator[pathlib.Path]:
+    """Keep saved games and settings of the test in its own temporary directory."""
+    previous_cache_dir = GameStateManager.get_cache_dir()
+    GameStateManager.set_cache_dir(tmp_path)
+    yield tmp_path
+    GameStateManager.set_cache_dir(previous_cache_dir)
@@ -0,0 +1,104 @@
+import pytest
+from python_spielplatz.checkers.analysis import (
+    WIN_SCORE,
+    MoveAnalysis,
+    analyze_game_state,
+    analyze_move_sequence,
+)
+from python_spielplatz.checkers.board_state import BoardState, PieceType, Position
+from python_spielplatz.checkers.evaluation import EvaluationWeights
+from python_spielplatz.checkers.game_state import GameState, try_make_moves
+from python_spielplatz.checkers.movement import Move
+from python_spielplatz.checkers.pieces import PieceColor
+from python_spielplatz.checkers.standard_rule_set import StandardRuleSet
+
+OPENING_MOVE_SEQUENCES = 7
+"""Number of move sequences available to either player at the start of a game."""
+WHITE_FRONT_ROW = 2
+
+
+def _game_state(occupancies: dict[Position, PieceType]) -> GameState:
+    return GameState(
+        rule_set=StandardRuleSet(),
+        board_state=BoardState(occupancies=occupancies),
+        whose_turn=PieceColor.WHITE,
+    )
+
+
+def test_legal_move_sequences_at_start_of_game() -> None:
+    """Only the front row soldiers can move at the start of the game."""
+    game_state = _game_state(StandardRuleSet.initial_game_occupancies())
+    move_sequences = StandardRuleSet.legal_move_sequences(
+        game_state.board_state,
+        game_state.whose_turn,
+    )
+    assert len(move_sequences) == OPENING_MOVE_SEQUENCES
+    for moves in move_sequences:
+        assert moves[0].starting_position.row == WHITE_FRONT_ROW
+        assert isinstance(try_make_moves(moves, game_state, cache=None), GameState)
+
+
+def test_legal_move_sequences_include_every_capture_prefix() -> None:
+    """A capture sequence may stop after any capture."""
+    occupancies = {
+        Position(0, 0): PieceType.WHITE_SOLDIER,
+        Position(1, 1): PieceType.BLACK_SOLDIER,
+        Position(3, 3): PieceType.BLACK_SOLDIER,
+    }
+    move_sequences = StandardRuleSet.legal_move_sequences(
+        BoardState(occupancies=occupancies),
+        PieceColor.WHITE,
+    )
+    single_capture = [Move(Position(0, 0), Position(2, 2))]
+    double_capture = [*single_capture, Move(Position(2, 2), Position(4, 4))]
+    assert sorted(map(str, move_sequences)) == sorted(
+        map(str, [single_capture, double_capture])
+    )
+
+
+@pytest.mark.parametrize("depth", [1, 2])
+def test_forced_win_is_detected(depth: int) -> None:
+    """A move after which the opponent cannot move wins, at any depth."""
+    game_state = _game_state(
+        {
+            Position(3, 3): PieceType.WHITE_SOLDIER,
+            Position(0, 6): PieceType.BLACK_SOLDIER,
+        },
+    )
+    analysis = analyze_move_sequence(
+        game_state,
+        [Move(Position(3, 3), Position(4, 4))],
+        depth=depth,
+        weights=EvaluationWeights(),
+    )
+    assert isinstance(analysis, MoveAnalysis)
+    assert analysis.forced_win
+    assert analysis.score == WIN_SCORE
+    assert analysis.nodes == 1
+    assert analysis.best_line == [[Position(3, 3), Position(4, 4)]]
+
+
+def test_analyze_game_state_covers_every_move() -> None:
+    """Every move of the current player is analyzed exactly once."""
+    game_state = _game_state(StandardRuleSet.initial_game_occupancies())
+    depth = 2
+    analyses = list(analyze_game_state(game_state, depth=depth, max_workers=2))
+    assert all(isinstance(analysis, MoveAnalysis) for analysis in analyses)
+    move_paths = sorted(
+        str(analysis.move_path)
+        for analysis in analyses
+        if isinstance(analysis, MoveAnalysis)
+    )
+    expected_move_paths = sorted(
+        str([moves[0].starting_position, moves[-1].target_position])
+        for moves in StandardRuleSet.legal_move_sequences(
+            game_state.board_state,
+            game_state.whose_turn,
+        )
+    )
+    assert move_paths == expected_move_paths
+    for analysis in analyses:
+        assert isinstance(analysis, MoveAnalysis)
+        # white's opening moves do not block any of black's replies
+        assert analysis.nodes == 1 + OPENING_MOVE_SEQUENCES
+        assert len(analysis.best_line) == depth
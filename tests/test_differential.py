@@ -0,0 +1,138 @@
+"""Randomized differential test of the board representations and move application paths.
+
+Random legal games are played from the initial position, and at every ply all ways of representing
+and updating the board are checked to agree. The run is reproducible from its seed and bounded by
+a time budget, both of which can be set through environment variables:
+
+- CHECKERS_DIFFERENTIAL_SEED: seed of the random games (default 0)
+- CHECKERS_DIFFERENTIAL_SECONDS: time budget in seconds (default 2)
+"""
+
+import os
+import random
+import time
+
+import numpy as np
+import pytest
+from python_spielplatz.checkers.board_state import BoardState
+from python_spielplatz.checkers.checkerserror import CheckersError
+from python_spielplatz.checkers.evaluation import LinearEvaluator
+from python_spielplatz.checkers.game_state import GameState, try_make_moves
+from python_spielplatz.checkers.game_state_persistence import GameStateManager
+from python_spielplatz.checkers.move_validation_cache import MoveValidationCache
+from python_spielplatz.checkers.movement import Move
+from python_spielplatz.checkers.packed_board import (
+    PACKED_EMPTY,
+    PackedBoards,
+    pack_board,
+    pack_boards,
+    unpack_board,
+)
+from python_spielplatz.checkers.pieces import PieceColor
+from python_spielplatz.checkers.position_hash import position_hash
+from python_spielplatz.checkers.standard_rule_set import StandardRuleSet
+
+MAX_PLIES_PER_GAME = 200
+
+SEED = int(os.environ.get("CHECKERS_DIFFERENTIAL_SEED", "0"))
+TIME_BUDGET_SECONDS = float(os.environ.get("CHECKERS_DIFFERENTIAL_SECONDS", "2"))
+
+
+pytestmark = pytest.mark.usefixtures("cache_dir")
+
+
+def test_board_representations_agree_in_random_games() -> None:
+    """All board representations agree at every ply of random legal games."""
+    seed_generator = random.Random(SEED)
+    deadline = time.monotonic() + TIME_BUDGET_SECONDS
+    games_played = 0
+    while games_played == 0 or time.monotonic() < deadline:
+        game_seed = seed_generator.randrange(2**32)
+        _play_random_game(game_seed, deadline)
+        games_played += 1
+
+
+def _play_random_game(game_seed: int, deadline: float) -> None:
+    rng = random.Random(game_seed)
+    rule_set = StandardRuleSet()
+    game_state = GameState(
+        rule_set=rule_set,
+        board_state=BoardState(occupancies=rule_set.initial_game_occupancies()),
+        whose_turn=rule_set.first_player(),
+    )
+    cache = MoveValidationCache()
+    evaluator = LinearEvaluator()
+    game = GameStateManager.initialize_new_game(rule_set)
+    assert not isinstance(game, CheckersError)
+
+    for ply in range(MAX_PLIES_PER_GAME):
+        context = f"(seed {SEED}, game seed {game_seed}, ply {ply})"
+        move_sequences = rule_set.legal_move_sequences(
+            game_state.board_state,
+            game_state.whose_turn,
+        )
+        if not move_sequences or time.monotonic() > deadline:
+            return
+        # move generation: every generated sequence is accepted by validation
+        for candidate_moves in move_sequences:
+            candidate_result = try_make_moves(candidate_moves, game_state, cache=None)
+            assert isinstance(
+                candidate_result, GameState
+            ), f"{candidate_moves} {context}"
+        moves = rng.choice(move_sequences)
+
+        occupancies_before = dict(game_state.board_state.occupancies)
+        next_game_state = try_make_moves(moves, game_state, cache=None)
+        assert isinstance(next_game_state, GameState), f"{moves} rejected {context}"
+        assert game_state.board_state.occupancies == occupancies_before, context
+        expected_board_state = next_game_state.board_state
+
+        # move application: independent replay on the packed board
+        replayed_board = _replay_on_packed_board(moves, game_state)
+        assert np.array_equal(replayed_board, pack_board(expected_board_state)), context
+        # move application: validation cache, on the first lookup and on a repeated lookup
+        for _ in range(2):
+            cached_game_state = try_make_moves(moves, game_state, cache=cache)
+            assert isinstance(cached_game_state, GameState), context
+            assert cached_game_state.board_state == expected_board_state, context
+            assert cached_game_state.whose_turn == next_game_state.whose_turn, context
+            assert cached_game_state.ply == next_game_state.ply, context
+
+        # packed form
+        unpacked_board_state = unpack_board(pack_board(expected_board_state))
+        assert unpacked_board_state == expected_board_state, context
+        assert position_hash(unpacked_board_state, next_game_state.whose_turn) == (
+            position_hash(expected_board_state, next_game_state.whose_turn)
+        ), context
+        assert evaluator.evaluate_batch(pack_boards([expected_board_state]))[0] == (
+            evaluator.evaluate(unpacked_board_state)
+        ), context
+
+        # serialization round trip
+        save_result = GameStateManager.save_game_state(game.game_id, next_game_state)
+        assert save_result is None, context
+        loaded_game = GameStateManager.load_game_from_id(game.game_id)
+        assert not isinstance(loaded_game, CheckersError), context
+        assert loaded_game.game_state.board_state == expected_board_state, context
+        assert loaded_game.game_state.whose_turn == next_game_state.whose_turn, context
+        assert loaded_game.game_state.ply == next_game_state.ply, context
+
+        game_state = next_game_state
+
+
+def _replay_on_packed_board(moves: list[Move], game_state: GameState) -> PackedBoards:
+    """Apply moves to the packed board, without the rule set or BoardState.update.
+
+    Following the standard rule set, every move takes the piece from its starting square to its
+    target square, and jumped pieces stay on the board.
+    """
+    packed_board = pack_board(game_state.board_state)
+    player_sign = 1 if game_state.whose_turn == PieceColor.WHITE else -1
+    for move in moves:
+        start = (move.starting_position.row, move.starting_position.column)
+        target = (move.target_position.row, move.target_position.column)
+        value = packed_board[start]
+        assert value * player_sign > 0, f"{move} does not move a piece of the player"
+        packed_board[start] = PACKED_EMPTY
+        packed_board[target] = value
+    return packed_board
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from python_spielplatz.checkers.board_state import BoardState, PieceType, Position
+from python_spielplatz.checkers.evaluation import (
+    FEATURE_NAMES,
+    EvaluationWeights,
+    LinearEvaluator,
+    extract_features,
+)
+from python_spielplatz.checkers.packed_board import (
+    pack_board,
+    pack_boards,
+    unpack_board,
+)
+from python_spielplatz.checkers.standard_rule_set import StandardRuleSet
+
+
+def test_pack_board_round_trip() -> None:
+    """Unpacking a packed board gives back the original board state."""
+    board_state = BoardState(occupancies=StandardRuleSet.initial_game_occupancies())
+    board_state.occupancies[Position(4, 4)] = PieceType.BLACK_QUEEN
+    assert unpack_board(pack_board(board_state)) == board_state
+
+
+def test_initial_position_is_balanced() -> None:
+    """Both players start with equal features."""
+    board_state = BoardState(occupancies=StandardRuleSet.initial_game_occupancies())
+    features = extract_features(pack_boards([board_state]))
+    assert features.shape == (1, len(FEATURE_NAMES))
+    assert np.all(features == 0)
+    assert LinearEvaluator().evaluate(board_state) == 0
+
+
+def test_extract_features() -> None:
+    """Features are white values minus black values."""
+    board_state = BoardState(
+        occupancies={
+            Position(0, 0): PieceType.WHITE_SOLDIER,
+            Position(3, 3): PieceType.WHITE_SOLDIER,
+            Position(4, 4): PieceType.BLACK_SOLDIER,
+            Position(6, 0): PieceType.WHITE_QUEEN,
+        },
+    )
+    features = dict(
+        zip(
+            FEATURE_NAMES, extract_features(pack_boards([board_state]))[0], strict=True
+        ),
+    )
+    assert features == {
+        "material": 2,
+        "queens": 1,
+        "advancement": 3 - 3,
+        # white: one step each for the soldiers (edge of board, 4,4 occupied), two for the queen
+        # black: the soldier at 4,4 can only step to 3,5, since 3,3 is occupied
+        "mobility": (1 + 1 + 2) - 1,
+        "back_rank_guards": 1,
+    }
+
+
+@pytest.mark.parametrize(
+    "weights", [EvaluationWeights(), EvaluationWeights(material=3)]
+)
+def test_batch_evaluation_matches_single_evaluation(weights: EvaluationWeights) -> None:
+    """Scoring a batch gives the same result as scoring every board on its own."""
+    board_states = [
+        BoardState(occupancies=StandardRuleSet.initial_game_occupancies()),
+        BoardState(occupancies={Position(2, 2): PieceType.WHITE_SOLDIER}),
+        BoardState(occupancies={Position(7, 7): PieceType.BLACK_QUEEN}),
+    ]
+    evaluator = LinearEvaluator(weights)
+    batch_scores = evaluator.evaluate_batch(pack_boards(board_states))
+    assert list(batch_scores) == [
+        evaluator.evaluate(board_state) for board_state in board_states
+    ]
+    assert batch_scores[1] > 0
+    assert batch_scores[2] < 0
@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from python_spielplatz.checkers.board_state import BoardState, Position
+from python_spielplatz.checkers.checkerserror import CheckersError
+from python_spielplatz.checkers.game_state import GameState, try_make_moves
+from python_spielplatz.checkers.move_validation_cache import MoveValidationCache
+from python_spielplatz.checkers.movement import Move
+from python_spielplatz.checkers.pieces import PieceColor
+from python_spielplatz.checkers.position_hash import position_hash
+from python_spielplatz.checkers.standard_rule_set import StandardRuleSet
+
+
+@pytest.fixture()
+def game_state() -> GameState:
+    """Game state at the start of a standard game."""
+    return GameState(
+        rule_set=StandardRuleSet(),
+        board_state=BoardState(occupancies=StandardRuleSet.initial_game_occupancies()),
+        whose_turn=PieceColor.WHITE,
+    )
+
+
+def test_try_make_moves(game_state: GameState) -> None:
+    """A legal move updates the board, passes the turn and counts the ply."""
+    new_game_state = try_make_moves([Move(Position(2, 0), Position(3, 1))], game_state)
+    assert isinstance(new_game_state, GameState)
+    assert new_game_state.board_state.occupancies[Position(3, 1)] == (
+        game_state.board_state.occupancies[Position(2, 0)]
+    )
+    assert Position(2, 0) not in new_game_state.board_state.occupancies
+    assert new_game_state.whose_turn == PieceColor.BLACK
+    assert new_game_state.ply == 1
+    assert Position(3, 1) not in game_state.board_state.occupancies
+
+
+@pytest.mark.parametrize(
+    "moves",
+    [
+        [Move(Position(2, 0), Position(3, 1))],
+        [Move(Position(5, 1), Position(4, 0))],
+        [Move(Position(2, 0), Position(3, 1)), Move(Position(3, 1), Position(3, 1))],
+    ],
+)
+def test_cached_results_match_uncached_results(
+    game_state: GameState, moves: list[Move]
+) -> None:
+    """Results answered from the cache are equal to freshly validated results."""
+    cache = MoveValidationCache()
+    uncached_result = try_make_moves(moves, game_state, cache=None)
+    first_result = try_make_moves(moves, game_state, cache=cache)
+    second_result = try_make_moves(moves, game_state, cache=cache)
+
+    for result in (first_result, second_result):
+        if isinstance(uncached_result, CheckersError):
+            assert result == uncached_result
+        else:
+            assert isinstance(result, GameState)
+            assert result.board_state == uncached_result.board_state
+            assert result.whose_turn == uncached_result.whose_turn
+    statistics = cache.statistics()
+    assert (statistics.hits, statistics.misses, statistics.hit_rate) == (1, 1, 0.5)
+
+
+def test_cached_game_states_are_shared_per_ply(game_state: GameState) -> None:
+    """The cache returns the same game state for the same moves from the same ply."""
+    cache = MoveValidationCache()
+    moves = [Move(Position(2, 0), Position(3, 1))]
+    first_result = try_make_moves(moves, game_state, cache=cache)
+    second_result = try_make_moves(moves, game_state, cache=cache)
+    assert isinstance(first_result, GameState)
+    assert second_result is first_result
+
+    later_game_state = GameState(
+        rule_set=game_state.rule_set,
+        board_state=game_state.board_state,
+        whose_turn=game_state.whose_turn,
+        ply=2,
+    )
+    later_result = try_make_moves(moves, later_game_state, cache=cache)
+    assert isinstance(later_result, GameState)
+    assert later_result.ply == later_game_state.ply + 1
+
+
+def test_position_key_is_carried_over_by_cached_moves(game_state: GameState) -> None:
+    """The key computed from the changed positions equals the hash of the whole board."""
+    cache = MoveValidationCache()
+    for moves in (
+        [Move(Position(2, 0), Position(3, 1))],
+        [Move(Position(5, 1), Position(4, 2))],
+        # the first move replaces the piece on its target position
+        [Move(Position(3, 1), Position(5, 3)), Move(Position(5, 3), Position(3, 5))],
+    ):
+        next_game_state = try_make_moves(moves, game_state, cache=cache)
+        assert isinstance(next_game_state, GameState)
+        assert "position_key" in vars(next_game_state)
+        assert next_game_state.position_key == position_hash(
+            next_game_state.board_state,
+            next_game_state.whose_turn,
+        )
+        game_state = next_game_state
+
+
+def test_least_recently_used_entries_are_evicted(game_state: GameState) -> None:
+    """The cache holds at most max_size entries."""
+    cache = MoveValidationCache(max_size=2)
+    first_moves, second_moves, third_moves = (
+        [Move(Position(2, column), Position(3, column + 1))] for column in (0, 2, 4)
+    )
+    try_make_moves(first_moves, game_state, cache=cache)
+    try_make_moves(second_moves, game_state, cache=cache)
+    try_make_moves(first_moves, game_state, cache=cache)
+    try_make_moves(third_moves, game_state, cache=cache)
+    assert cache.statistics().evictions == 1
+
+    try_make_moves(first_moves, game_state, cache=cache)
+    try_make_moves(second_moves, game_state, cache=cache)
+    statistics = cache.statistics()
+    assert (statistics.hits, statistics.misses, statistics.size) == (2, 4, 2)
+
+
+def test_cache_can_be_shared_between_threads(game_state: GameState) -> None:
+    """Concurrent lookups keep the cache within max_size and count every lookup once."""
+    cache = MoveValidationCache(max_size=3)
+    move_sequences = game_state.rule_set.legal_move_sequences(
+        game_state.board_state,
+        game_state.whose_turn,
+    )
+    lookups = 50 * len(move_sequences)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(
+                lambda moves: try_make_moves(moves, game_state, cache=cache),
+                move_sequences * 50,
+            ),
+        )
+    assert all(isinstance(result, GameState) for result in results)
+    statistics = cache.statistics()
+    assert statistics.hits + statistics.misses == lookups
+    assert statistics.size <= cache.max_size
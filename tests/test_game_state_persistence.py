@@ -0,0 +1,167 @@
+import json
+import os
+import pathlib
+import pickle
+import time
+from datetime import timedelta
+from uuid import UUID
+
+import pytest
+from python_spielplatz.checkers.checkerserror import CheckersError
+from python_spielplatz.checkers.game_state_persistence import (
+    Game,
+    GameStateManager,
+    GameSummary,
+    GlobalSettings,
+)
+from python_spielplatz.checkers.pieces import PieceColor
+from python_spielplatz.checkers.standard_rule_set import StandardRuleSet
+
+pytestmark = pytest.mark.usefixtures("cache_dir")
+
+
+def _new_game() -> Game:
+    game = GameStateManager.initialize_new_game(StandardRuleSet())
+    assert isinstance(game, Game)
+    return game
+
+
+def test_iter_game_summaries(cache_dir: pathlib.Path) -> None:
+    """Every saved game is summarized, broken files are reported as errors."""
+    games = [_new_game() for _ in range(5)]
+    broken_game_path = (
+        cache_dir / "games" / "00" / "00000000-0000-0000-0000-000000000000.pkl"
+    )
+    broken_game_path.parent.mkdir(parents=True, exist_ok=True)
+    broken_game_path.write_bytes(b"not a pickle")
+
+    results = list(GameStateManager.iter_game_summaries(max_workers=2))
+    summaries = [result for result in results if isinstance(result, GameSummary)]
+    errors = [result for result in results if isinstance(result, CheckersError)]
+    assert len(errors) == 1
+    assert {summary.game_id for summary in summaries} == {
+        game.game_id for game in games
+    }
+    pieces_per_player = len(StandardRuleSet.initial_game_occupancies()) // 2
+    for summary in summaries:
+        assert summary.whose_turn == PieceColor.WHITE
+        assert summary.ply == 0
+        assert summary.white_pieces == summary.black_pieces == pieces_per_player
+
+
+def test_prune_saved_games_keeps_recent_and_current_games(
+    cache_dir: pathlib.Path,
+) -> None:
+    """Only old games that are not the current game are deleted."""
+    current_game, old_game, recent_game = (_new_game() for _ in range(3))
+    GameStateManager.update_global_checkers_settings(
+        GlobalSettings(current_game_identifier=current_game.game_id),
+    )
+    two_days_ago = time.time() - timedelta(days=2).total_seconds()
+    for game in (current_game, old_game):
+        game_path = cache_dir / "games" / str(game.game_id)[:2] / f"{game.game_id}.pkl"
+        os.utime(game_path, (two_days_ago, two_days_ago))
+
+    stray_file_path = cache_dir / "games" / "zz" / "notes.pkl"
+    stray_file_path.parent.mkdir()
+    stray_file_path.write_bytes(b"not a game")
+    os.utime(stray_file_path, (two_days_ago, two_days_ago))
+
+    results = list(GameStateManager.prune_saved_games(timedelta(days=1)))
+    assert [result for result in results if isinstance(result, UUID)] == [
+        old_game.game_id,
+    ]
+    assert len([result for result in results if isinstance(result, CheckersError)]) == 1
+    assert stray_file_path.exists()
+    assert sorted(GameStateManager.get_saved_game_list()) == sorted(
+        ["notes", str(current_game.game_id), str(recent_game.game_id)],
+    )
+
+
+def test_export_reports_games_that_cannot_be_unpickled(tmp_path: pathlib.Path) -> None:
+    """A game referencing a missing module is reported, the other games are exported."""
+    game = _new_game()
+    broken_game_id = "00000000-0000-0000-0000-000000000000"
+    broken_game_path = tmp_path / "games" / "00" / f"{broken_game_id}.pkl"
+    broken_game_path.parent.mkdir(parents=True, exist_ok=True)
+    # a protocol 0 pickle of a global from a module that does not exist
+    broken_game_path.write_bytes(b"cno_such_module\nmissing\n.")
+
+    results = list(GameStateManager.export_saved_games(tmp_path / "games.jsonl"))
+    assert [result for result in results if isinstance(result, UUID)] == [game.game_id]
+    assert len([result for result in results if isinstance(result, CheckersError)]) == 1
+
+
+def test_export_saved_games(tmp_path: pathlib.Path) -> None:
+    """Every game is written as one JSON line."""
+    games = [_new_game() for _ in range(3)]
+    export_path = tmp_path / "export" / "games.jsonl"
+    export_path.parent.mkdir()
+
+    exported = [
+        game_id
+        for game_id in GameStateManager.export_saved_games(export_path)
+        if isinstance(game_id, UUID)
+    ]
+    assert sorted(exported) == sorted(game.game_id for game in games)
+    lines = [json.loads(line) for line in export_path.read_text().splitlines()]
+    assert len(lines) == len(games)
+    for line in lines:
+        assert line["rule_set"] == "StandardRuleSet"
+        assert line["whose_turn"] == "WHITE"
+        assert line["occupancies"]["0,0"] == "WHITE_SOLDIER"
+
+
+def test_games_are_sharded_by_id_prefix(cache_dir: pathlib.Path) -> None:
+    """Saved games are stored in a subdirectory named after the start of their id."""
+    game = _new_game()
+    game_id = str(game.game_id)
+    assert (cache_dir / "games" / game_id[:2] / f"{game_id}.pkl").exists()
+    assert GameStateManager.get_saved_game_list() == [game_id]
+
+
+def test_migrate_flat_layout(cache_dir: pathlib.Path) -> None:
+    """Games saved directly in the cache directory can be moved into the sharded layout."""
+    game = _new_game()
+    flat_game_path = cache_dir / f"{game.game_id}.pkl"
+    with flat_game_path.open("wb") as game_file:
+        pickle.dump(game.game_state, game_file)
+    other_game = _new_game()
+    GameStateManager.update_global_checkers_settings(
+        GlobalSettings(current_game_identifier=other_game.game_id),
+    )
+    (cache_dir / "games" / str(game.game_id)[:2] / f"{game.game_id}.pkl").unlink()
+    assert isinstance(GameStateManager.load_game_from_id(game.game_id), CheckersError)
+
+    assert list(GameStateManager.migrate_flat_layout()) == [game.game_id]
+    assert not flat_game_path.exists()
+    migrated_game = GameStateManager.load_game_from_id(game.game_id)
+    assert isinstance(migrated_game, Game)
+    assert migrated_game.game_state.board_state == game.game_state.board_state
+    assert GameStateManager.get_global_checkers_settings() == GlobalSettings(
+        current_game_identifier=other_game.game_id,
+    )
+
+
+def test_clear_saved_games_removes_flat_layout_games(
+    cache_dir: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Un-migrated games are reported by the game list and deleted with all other games."""
+    game = _new_game()
+    flat_game_path = cache_dir / f"{game.game_id}.pkl"
+    with flat_game_path.open("wb") as game_file:
+        pickle.dump(game.game_state, game_file)
+    book_path = cache_dir / "StandardRuleSet.book"
+    book_path.touch()
+
+    GameStateManager.get_saved_game_list()
+    assert "older layout" in caplog.text
+
+    monkeypatch.setattr("click.confirm", lambda _: True)
+    GameStateManager.clear_saved_games()
+    assert not flat_game_path.exists()
+    assert not (cache_dir / "games").exists()
+    assert book_path.exists()
+    assert GameStateManager.get_saved_game_list() == []
@@ -0,0 +1,188 @@
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+
+from python_spielplatz.checkers.board_state import BoardState, Position
+from python_spielplatz.checkers.checkerserror import CheckersError
+from python_spielplatz.checkers.game_state import GameState
+from python_spielplatz.checkers.move_validation_cache import MoveValidationCache
+from python_spielplatz.checkers.opening_book import (
+    BOOK_MAX_PLY,
+    OpeningBook,
+    book_entries_from_game,
+    record_played_moves,
+)
+from python_spielplatz.checkers.pieces import PieceColor
+from python_spielplatz.checkers.position_hash import position_hash
+from python_spielplatz.checkers.standard_rule_set import StandardRuleSet
+
+
+def _initial_game_state() -> GameState:
+    rule_set = StandardRuleSet()
+    return GameState(
+        rule_set=rule_set,
+        board_state=BoardState(occupancies=rule_set.initial_game_occupancies()),
+        whose_turn=rule_set.first_player(),
+    )
+
+
+def test_position_hash_depends_on_player_to_move() -> None:
+    """The same board with a different player to move is a different position."""
+    board_state = BoardState(occupancies=StandardRuleSet.initial_game_occupancies())
+    assert position_hash(board_state, PieceColor.WHITE) != position_hash(
+        board_state,
+        PieceColor.BLACK,
+    )
+    assert position_hash(board_state, PieceColor.WHITE) == position_hash(
+        BoardState(occupancies=StandardRuleSet.initial_game_occupancies()),
+        PieceColor.WHITE,
+    )
+
+
+def test_lookup_on_missing_book_is_empty(tmp_path: pathlib.Path) -> None:
+    """A book that was never written has no moves."""
+    game_state = _initial_game_state()
+    book = OpeningBook(tmp_path / "missing.book")
+    assert book.lookup(game_state.board_state, game_state.whose_turn) == []
+    assert book.suggest_moves(game_state.board_state, game_state.whose_turn) is None
+
+
+def test_recorded_moves_are_counted_and_sorted(tmp_path: pathlib.Path) -> None:
+    """Recording is incremental, and lookups return the most played move first."""
+    game_state = _initial_game_state()
+    book = OpeningBook(tmp_path / "test.book")
+    rare_path = [Position(2, 2), Position(3, 3)]
+    common_path = [Position(2, 0), Position(3, 1)]
+    assert record_played_moves(book, game_state, rare_path) is None
+    assert record_played_moves(book, game_state, common_path) is None
+    assert record_played_moves(book, game_state, common_path) is None
+
+    book_moves = book.lookup(game_state.board_state, game_state.whose_turn)
+    assert [
+        (list(book_move.move_path), book_move.count) for book_move in book_moves
+    ] == [
+        (common_path, 2),
+        (rare_path, 1),
+    ]
+    assert book.lookup(game_state.board_state, PieceColor.BLACK) == []
+    suggested_moves = book.suggest_moves(game_state.board_state, game_state.whose_turn)
+    assert suggested_moves is not None
+    assert suggested_moves == book_moves[0].moves()
+
+
+def test_moves_beyond_opening_off_board_and_without_target_are_not_recorded(
+    tmp_path: pathlib.Path,
+) -> None:
+    """Only opening moves that fit on the board and reach a target end up in the book."""
+    game_state = _initial_game_state()
+    late_game_state = GameState(
+        rule_set=game_state.rule_set,
+        board_state=game_state.board_state,
+        whose_turn=game_state.whose_turn,
+        ply=BOOK_MAX_PLY,
+    )
+    book = OpeningBook(tmp_path / "test.book")
+    record_played_moves(book, late_game_state, [Position(2, 0), Position(3, 1)])
+    record_played_moves(book, game_state, [Position(2, 0), Position(9, 1)])
+    record_played_moves(book, game_state, [Position(2, 0)])
+    assert book.lookup(game_state.board_state, game_state.whose_turn) == []
+
+
+def test_book_entries_from_game_replays_moves() -> None:
+    """Every turn of a game is keyed by the position it was played from."""
+    first_path = [Position(2, 0), Position(3, 1)]
+    second_path = [Position(5, 1), Position(4, 0)]
+    entries = book_entries_from_game(StandardRuleSet(), [first_path, second_path])
+    assert isinstance(entries, list)
+    assert [move_path for _, move_path in entries] == [first_path, second_path]
+    assert entries[0][0] == position_hash(
+        _initial_game_state().board_state,
+        PieceColor.WHITE,
+    )
+
+
+def test_book_entries_from_game_shares_cache_between_games() -> None:
+    """Games with a common opening reuse the validated moves and get the same entries."""
+    first_path = [Position(2, 0), Position(3, 1)]
+    game = [first_path, [Position(5, 1), Position(4, 0)]]
+    other_game = [first_path, [Position(5, 3), Position(4, 2)]]
+    cache = MoveValidationCache()
+    cached_entries = [
+        book_entries_from_game(StandardRuleSet(), move_paths, cache)
+        for move_paths in (game, other_game)
+    ]
+    assert cached_entries == [
+        book_entries_from_game(StandardRuleSet(), move_paths)
+        for move_paths in (game, other_game)
+    ]
+    assert cache.statistics().hits == 1
+
+
+def test_book_entries_from_game_rejects_illegal_moves() -> None:
+    """An illegal move invalidates the whole game."""
+    entries = book_entries_from_game(
+        StandardRuleSet(), [[Position(5, 1), Position(4, 0)]]
+    )
+    assert isinstance(entries, CheckersError)
+
+
+def test_book_entries_from_game_rejects_move_paths_without_target() -> None:
+    """A move path with a single position is not a move."""
+    entries = book_entries_from_game(StandardRuleSet(), [[Position(2, 0)]])
+    assert isinstance(entries, CheckersError)
+    assert isinstance(book_entries_from_game(StandardRuleSet(), [[]]), CheckersError)
+
+
+def test_lookup_sees_moves_recorded_by_another_instance(tmp_path: pathlib.Path) -> None:
+    """Moves appended to the delta after a lookup are found by the next lookup."""
+    game_state = _initial_game_state()
+    book_path = tmp_path / "test.book"
+    reading_book = OpeningBook(book_path)
+    recording_book = OpeningBook(book_path, delta_merge_records=2)
+    move_path = [Position(2, 0), Position(3, 1)]
+    for expected_count in range(1, 5):
+        record_played_moves(recording_book, game_state, move_path)
+        book_moves = reading_book.lookup(game_state.board_state, game_state.whose_turn)
+        assert [book_move.count for book_move in book_moves] == [expected_count]
+
+
+def _record_moves_repeatedly(
+    book_path: pathlib.Path,
+    repetitions: int,
+    delta_merge_records: int,
+) -> None:
+    game_state = _initial_game_state()
+    book = OpeningBook(book_path, delta_merge_records=delta_merge_records)
+    for _ in range(repetitions):
+        record_played_moves(book, game_state, [Position(2, 0), Position(3, 1)])
+
+
+def test_concurrent_recording_does_not_lose_moves(tmp_path: pathlib.Path) -> None:
+    """Moves recorded by several processes are all counted, across delta merges."""
+    book_path = tmp_path / "test.book"
+    process_count, repetitions, delta_merge_records = 4, 25, 8
+    with ProcessPoolExecutor(max_workers=process_count) as executor:
+        futures = [
+            executor.submit(
+                _record_moves_repeatedly,
+                book_path,
+                repetitions,
+                delta_merge_records,
+            )
+            for _ in range(process_count)
+        ]
+        for future in futures:
+            future.result()
+    assert book_path.exists()
+
+    game_state = _initial_game_state()
+    book = OpeningBook(book_path)
+    book_moves = book.lookup(game_state.board_state, game_state.whose_turn)
+    assert [book_move.count for book_move in book_moves] == [
+        process_count * repetitions
+    ]
+    assert book.merge() is None
+    assert not book.delta_path.exists()
+    book_moves = book.lookup(game_state.board_state, game_state.whose_turn)
+    assert [book_move.count for book_move in book_moves] == [
+        process_count * repetitions
+    ]